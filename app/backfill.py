@@ -0,0 +1,51 @@
+from typing import Dict
+
+from PIL import Image
+
+from .config import DB_PATH, RESOLUTIONS, UPLOAD_DIR
+from .db import get_db, init_db
+from .services.images_service import build_placeholder
+from .services.startup_service import startup_lock
+
+BATCH_SIZE = 100
+
+
+def backfill_placeholders(db_path: str, upload_dir: str, resolutions: Dict[str, int]) -> int:
+    """Compute placeholders for rows uploaded before the columns existed"""
+    # Add the placeholder columns first; this may run before the server has
+    # been restarted on the new schema, and must not race a starting worker.
+    with startup_lock(f"{db_path}.init.lock"):
+        init_db(db_path)
+
+    label = min(resolutions, key=resolutions.get)
+    conn = get_db(db_path)
+    c = conn.cursor()
+    c.execute("SELECT id FROM images WHERE placeholder IS NULL")
+    file_ids = [row["id"] for row in c.fetchall()]
+
+    updated = 0
+    for file_id in file_ids:
+        file_path = f"{upload_dir}/{label}/{file_id}"
+        try:
+            with Image.open(file_path) as img:
+                preview = build_placeholder(img)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            print(f"Skipping {file_id}: {exc}")
+            continue
+
+        c.execute(
+            "UPDATE images SET placeholder = ?, dominant_color = ? WHERE id = ?",
+            (preview["placeholder"], preview["dominant_color"], file_id),
+        )
+        updated += 1
+        # Commit in batches so an interrupted run keeps its progress.
+        if updated % BATCH_SIZE == 0:
+            conn.commit()
+
+    conn.commit()
+    conn.close()
+    return updated
+
+
+if __name__ == "__main__":
+    print(f"{backfill_placeholders(DB_PATH, UPLOAD_DIR, RESOLUTIONS)} images updated")
@@ -12,3 +12,33 @@ RESOLUTIONS = {
     "w780": 780,
     "w300": 300,
 }
+
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "data/ratelimit.db")
+
+# Token buckets per API key and endpoint class: (tokens per second, burst size)
+RATE_LIMITS = {
+    "upload": (float(os.getenv("UPLOAD_RATE_PER_SEC", "1")), int(os.getenv("UPLOAD_BURST", "10"))),
+    "query": (float(os.getenv("QUERY_RATE_PER_SEC", "10")), int(os.getenv("QUERY_BURST", "50"))),
+    "backup": (float(os.getenv("BACKUP_RATE_PER_SEC", "0.01")), int(os.getenv("BACKUP_BURST", "2"))),
+}
+
+# Maximum concurrent requests per API key and endpoint class, across all workers
+MAX_INFLIGHT = {
+    "upload": int(os.getenv("UPLOAD_MAX_INFLIGHT", "2")),
+    "backup": int(os.getenv("BACKUP_MAX_INFLIGHT", "1")),
+}
+# In-flight slots are leases renewed while the request runs; a worker that dies
+# mid-request frees its slot once the lease lapses.
+INFLIGHT_LEASE_SECONDS = int(os.getenv("INFLIGHT_LEASE_SECONDS", "60"))
+
+for _endpoint_class, (_rate, _burst) in RATE_LIMITS.items():
+    if _rate <= 0 or _burst < 1:
+        raise ValueError(f"Invalid rate limit for {_endpoint_class}: rate must be > 0 and burst >= 1")
+
+for _endpoint_class, _limit in MAX_INFLIGHT.items():
+    if _limit < 0:
+        raise ValueError(f"Invalid in-flight limit for {_endpoint_class}: must be >= 0 (0 disables it)")
+
+# Leases are renewed every third of their length, so shorter values would spin.
+if INFLIGHT_LEASE_SECONDS < 3:
+    raise ValueError("INFLIGHT_LEASE_SECONDS must be >= 3")
@@ -34,10 +34,16 @@ def init_db(db_path: str = DB_PATH) -> None:
             original_width INTEGER,
             original_height INTEGER,
             file_sizes TEXT,
-            keywords TEXT
+            keywords TEXT,
+            placeholder TEXT,
+            dominant_color TEXT
         )
         """
     )
+    columns = {row[1] for row in c.execute("PRAGMA table_info(images)")}
+    for column in ("placeholder", "dominant_color"):
+        if column not in columns:
+            c.execute(f"ALTER TABLE images ADD COLUMN {column} TEXT")
     conn.commit()
     conn.close()
 
@@ -1,19 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
-from .config import RESOLUTIONS, UPLOAD_DIR
+from .config import DB_PATH, RESOLUTIONS, UPLOAD_DIR
 from .db import init_db
 from .routes.backup import router as backup_router
 from .routes.health import router as health_router
 from .routes.images import router as images_router
+from .services.ratelimit_service import init_rate_limit_db
+from .services.startup_service import startup_lock
 from .services.storage_service import ensure_upload_dirs
 
-app = FastAPI(title="Anime Image Service", version="1.0.0")
 
-init_db()
-ensure_upload_dirs(UPLOAD_DIR, RESOLUTIONS)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every gunicorn worker runs this; the lock keeps them from racing on
+    # the DB header check in init_db.
+    with startup_lock(f"{DB_PATH}.init.lock"):
+        init_db()
+        init_rate_limit_db()
+        ensure_upload_dirs(UPLOAD_DIR, RESOLUTIONS)
+    yield
+
+
+app = FastAPI(title="Anime Image Service", version="1.0.0", lifespan=lifespan)
 
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
 app.include_router(health_router)
 app.include_router(images_router)
@@ -9,6 +9,7 @@ from ..services.backup_service import (
     list_backups,
     restore_backup_group,
 )
+from ..services.ratelimit_service import admit, check_rate_limit
 
 router = APIRouter(prefix="/backup")
 
@@ -21,16 +22,18 @@ def _require_api_key(x_api_key: str) -> None:
 @router.post("/backup")
 async def backup_full_endpoint(x_api_key: str = Header(None)):
     _require_api_key(x_api_key)
-    try:
-        results = backup_full(DB_PATH, UPLOAD_DIR)
-        return {"status": "success", "message": "Full backup completed", "details": results}
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Backup failed: {str(exc)}")
+    async with admit(x_api_key, "backup"):
+        try:
+            results = backup_full(DB_PATH, UPLOAD_DIR)
+            return {"status": "success", "message": "Full backup completed", "details": results}
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Backup failed: {str(exc)}")
 
 
 @router.get("/backups")
 async def list_backups_endpoint(x_api_key: str = Header(None), limit: int = 10):
     _require_api_key(x_api_key)
+    await check_rate_limit(x_api_key, "query")
     try:
         return list_backups(limit)
     except Exception as exc:
@@ -40,15 +43,17 @@ async def list_backups_endpoint(x_api_key: str = Header(None), limit: int = 10):
 @router.post("/restore/{folder_id}")
 async def restore_backup_group_endpoint(folder_id: str, x_api_key: str = Header(None)):
     _require_api_key(x_api_key)
-    try:
-        return restore_backup_group(folder_id, DB_PATH, UPLOAD_DIR)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Restore failed: {str(exc)}")
+    async with admit(x_api_key, "backup"):
+        try:
+            return restore_backup_group(folder_id, DB_PATH, UPLOAD_DIR)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Restore failed: {str(exc)}")
 
 
 @router.delete("/{folder_id}")
 async def delete_backup_endpoint(folder_id: str, x_api_key: str = Header(None)):
     _require_api_key(x_api_key)
+    await check_rate_limit(x_api_key, "query")
     try:
         return delete_backup(folder_id)
     except Exception as exc:
@@ -6,6 +6,7 @@ from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
 from ..config import API_KEY, DB_PATH, RESOLUTIONS, UPLOAD_DIR
 from ..db import get_db
 from ..services.images_service import build_urls, parse_file_sizes, save_image_variants, serialize_file_sizes
+from ..services.ratelimit_service import admit, check_rate_limit
 from ..services.storage_service import delete_image_files
 
 router = APIRouter()
@@ -20,22 +21,26 @@ async def upload_image(
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
-    contents = await file.read()
-    try:
-        file_id, original_width, original_height, file_sizes = save_image_variants(
-            contents,
-            UPLOAD_DIR,
-            RESOLUTIONS,
-        )
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid image file")
+    async with admit(x_api_key, "upload"):
+        contents = await file.read()
+        try:
+            file_id, original_width, original_height, file_sizes, preview = save_image_variants(
+                contents,
+                UPLOAD_DIR,
+                RESOLUTIONS,
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid image file")
 
     conn = get_db(DB_PATH)
     c = conn.cursor()
     c.execute(
         """
-        INSERT INTO images (id, original_filename, uploaded_at, original_width, original_height, file_sizes, keywords)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO images (
+            id, original_filename, uploaded_at, original_width, original_height, file_sizes, keywords,
+            placeholder, dominant_color
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             file_id,
@@ -45,6 +50,8 @@ async def upload_image(
             original_height,
             serialize_file_sizes(file_sizes),
             keywords or "",
+            preview["placeholder"],
+            preview["dominant_color"],
         ),
     )
     conn.commit()
@@ -57,6 +64,7 @@ async def upload_image(
         "dimensions": {"width": original_width, "height": original_height},
         "file_sizes": file_sizes,
         "keywords": keywords or "",
+        **preview,
         "urls": build_urls(file_id, RESOLUTIONS),
     }
 
@@ -66,6 +74,8 @@ async def list_images(x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
+    await check_rate_limit(x_api_key, "query")
+
     conn = get_db(DB_PATH)
     c = conn.cursor()
     c.execute("SELECT * FROM images ORDER BY uploaded_at DESC")
@@ -85,6 +95,8 @@ async def list_images(x_api_key: str = Header(None)):
                 "dimensions": {"width": row["original_width"], "height": row["original_height"]},
                 "file_sizes": file_sizes,
                 "keywords": row_dict.get("keywords", ""),
+                "placeholder": row_dict.get("placeholder"),
+                "dominant_color": row_dict.get("dominant_color"),
                 "urls": build_urls(file_id, RESOLUTIONS),
             }
         )
@@ -97,6 +109,8 @@ async def get_image(file_id: str, x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
+    await check_rate_limit(x_api_key, "query")
+
     conn = get_db(DB_PATH)
     c = conn.cursor()
     c.execute("SELECT * FROM images WHERE id = ?", (file_id,))
@@ -115,6 +129,8 @@ async def get_image(file_id: str, x_api_key: str = Header(None)):
         "dimensions": {"width": row["original_width"], "height": row["original_height"]},
         "file_sizes": file_sizes,
         "keywords": row_dict.get("keywords", ""),
+        "placeholder": row_dict.get("placeholder"),
+        "dominant_color": row_dict.get("dominant_color"),
         "urls": build_urls(file_id, RESOLUTIONS),
     }
 
@@ -124,6 +140,8 @@ async def search_images(q: Optional[str] = None, x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
+    await check_rate_limit(x_api_key, "query")
+
     conn = get_db(DB_PATH)
     c = conn.cursor()
     
@@ -151,6 +169,8 @@ async def search_images(q: Optional[str] = None, x_api_key: str = Header(None)):
                 "dimensions": {"width": row["original_width"], "height": row["original_height"]},
                 "file_sizes": file_sizes,
                 "keywords": row_dict.get("keywords", ""),
+                "placeholder": row_dict.get("placeholder"),
+                "dominant_color": row_dict.get("dominant_color"),
                 "urls": build_urls(file_id, RESOLUTIONS),
             }
         )
@@ -163,6 +183,8 @@ async def delete_image(file_id: str, x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
+    await check_rate_limit(x_api_key, "query")
+
     conn = get_db(DB_PATH)
     c = conn.cursor()
     c.execute("SELECT * FROM images WHERE id = ?", (file_id,))
@@ -1,3 +1,4 @@
+import base64
 import io
 import json
 import os
@@ -7,8 +8,26 @@ from typing import Dict, Tuple
 
 from PIL import Image
 
+PLACEHOLDER_SIZE = 20
 
-def save_image_variants(contents: bytes, upload_dir: str, resolutions: Dict[str, int]) -> Tuple[str, int, int, Dict[str, int]]:
+
+def build_placeholder(img: Image.Image) -> Dict[str, str]:
+    thumb = img.convert("RGB")
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+
+    buffer = io.BytesIO()
+    thumb.save(buffer, "WEBP", quality=30)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    quantized = thumb.quantize(colors=4)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    dominant_color = f"#{r:02x}{g:02x}{b:02x}"
+
+    return {"placeholder": placeholder, "dominant_color": dominant_color}
+
+
+def save_image_variants(contents: bytes, upload_dir: str, resolutions: Dict[str, int]) -> Tuple[str, int, int, Dict[str, int], Dict[str, str]]:
     try:
         img = Image.open(io.BytesIO(contents))
         if img.mode in ("RGBA", "P"):
@@ -19,6 +38,7 @@ def save_image_variants(contents: bytes, upload_dir: str, resolutions: Dict[str,
     file_id = f"{uuid.uuid4()}.webp"
     original_width, original_height = img.size
     file_sizes: Dict[str, int] = {}
+    smallest_img = img
 
     for label, width in resolutions.items():
         target_width = min(width, original_width)
@@ -29,8 +49,13 @@ def save_image_variants(contents: bytes, upload_dir: str, resolutions: Dict[str,
         file_path = f"{upload_dir}/{label}/{file_id}"
         resized_img.save(file_path, "WEBP", quality=80)
         file_sizes[label] = os.path.getsize(file_path)
+        if resized_img.width < smallest_img.width:
+            smallest_img = resized_img
+
+    # Derive the placeholder from the smallest variant so it adds little to upload CPU.
+    preview = build_placeholder(smallest_img)
 
-    return file_id, original_width, original_height, file_sizes
+    return file_id, original_width, original_height, file_sizes, preview
 
 
 def serialize_file_sizes(file_sizes: Dict[str, int]) -> str:
@@ -0,0 +1,247 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional, TypeVar
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import INFLIGHT_LEASE_SECONDS, MAX_INFLIGHT, RATE_LIMIT_DB_PATH, RATE_LIMITS
+
+T = TypeVar("T")
+
+
+class AdmissionRejected(Exception):
+    status_code = 503
+    detail = "Service Unavailable"
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitExceeded(AdmissionRejected):
+    status_code = 429
+    detail = "Too Many Requests"
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after}s", retry_after)
+
+
+class RateLimitUnavailable(AdmissionRejected):
+    # The limiter store is write-locked by other workers. Requests are rejected
+    # rather than admitted unchecked, because that only happens under heavy load.
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Rate limiter store is locked", retry_after)
+
+
+class _Lease:
+    def __init__(self, slot_id: int, db_path: str):
+        self.slot_id = slot_id
+        self.db_path = db_path
+        self.stopped = threading.Event()
+        self.renewer = threading.Thread(target=self._renew, daemon=True)
+        self.renewer.start()
+
+    def _renew(self) -> None:
+        while not self.stopped.wait(INFLIGHT_LEASE_SECONDS / 3):
+            try:
+                conn = _connect(self.db_path)
+                try:
+                    conn.execute(
+                        "UPDATE inflight SET expires_at = ? WHERE id = ?",
+                        (time.time() + INFLIGHT_LEASE_SECONDS, self.slot_id),
+                    )
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    def release(self) -> None:
+        self.stopped.set()
+        self.renewer.join()
+        try:
+            conn = _connect(self.db_path)
+            try:
+                conn.execute("DELETE FROM inflight WHERE id = ?", (self.slot_id,))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # The lease is no longer renewed, so the slot frees itself on expiry.
+            pass
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # Autocommit mode so BEGIN IMMEDIATE takes the write lock up front; that
+    # lock is what serialises the read-modify-write across gunicorn workers.
+    conn = sqlite3.connect(db_path, timeout=1, isolation_level=None)
+    # Limiter state is disposable, so skip the per-commit fsync.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _client_key(api_key: str) -> str:
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:32]
+
+
+def init_rate_limit_db(db_path: str = RATE_LIMIT_DB_PATH) -> None:
+    dir_name = os.path.dirname(db_path)
+    if dir_name:
+        os.makedirs(dir_name, exist_ok=True)
+
+    conn = _connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS token_buckets (
+            client_key TEXT,
+            endpoint_class TEXT,
+            tokens REAL,
+            updated_at REAL,
+            PRIMARY KEY (client_key, endpoint_class)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS inflight (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_key TEXT,
+            endpoint_class TEXT,
+            expires_at REAL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inflight_client ON inflight (client_key, endpoint_class)")
+    conn.close()
+
+
+def _with_store(operation: Callable[[], T], db_path: str) -> T:
+    for attempt in range(2):
+        try:
+            return operation()
+        except sqlite3.OperationalError as exc:
+            if "database is locked" in str(exc):
+                raise RateLimitUnavailable()
+            if attempt or "no such table" not in str(exc):
+                raise
+            # The store was removed while the server was running; recreate it once.
+            init_rate_limit_db(db_path)
+    raise AssertionError("unreachable")
+
+
+def consume_token(api_key: str, endpoint_class: str, db_path: str = RATE_LIMIT_DB_PATH) -> None:
+    if endpoint_class not in RATE_LIMITS:
+        return
+
+    rate, burst = RATE_LIMITS[endpoint_class]
+    client_key = _client_key(api_key)
+    now = time.time()
+
+    def _consume() -> None:
+        conn = _connect(db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE client_key = ? AND endpoint_class = ?",
+                (client_key, endpoint_class),
+            ).fetchone()
+            tokens = float(burst) if row is None else min(float(burst), row[0] + max(0.0, now - row[1]) * rate)
+
+            if tokens < 1:
+                conn.execute("ROLLBACK")
+                raise RateLimitExceeded(max(1, math.ceil((1 - tokens) / rate)))
+
+            conn.execute(
+                """
+                INSERT INTO token_buckets (client_key, endpoint_class, tokens, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (client_key, endpoint_class)
+                DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+                """,
+                (client_key, endpoint_class, tokens - 1, now),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    _with_store(_consume, db_path)
+
+
+def acquire_slot(api_key: str, endpoint_class: str, db_path: str = RATE_LIMIT_DB_PATH) -> Optional[_Lease]:
+    limit = MAX_INFLIGHT.get(endpoint_class)
+    if not limit:
+        return None
+
+    client_key = _client_key(api_key)
+    now = time.time()
+
+    def _acquire() -> int:
+        conn = _connect(db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM inflight WHERE expires_at < ?", (now,))
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM inflight WHERE client_key = ? AND endpoint_class = ?",
+                (client_key, endpoint_class),
+            ).fetchone()
+
+            if count >= limit:
+                conn.execute("ROLLBACK")
+                raise RateLimitExceeded(1)
+
+            slot_id = conn.execute(
+                "INSERT INTO inflight (client_key, endpoint_class, expires_at) VALUES (?, ?, ?)",
+                (client_key, endpoint_class, now + INFLIGHT_LEASE_SECONDS),
+            ).lastrowid
+            conn.execute("COMMIT")
+            return slot_id
+        finally:
+            conn.close()
+
+    return _Lease(_with_store(_acquire, db_path), db_path)
+
+
+def release_slot(lease: Optional[_Lease]) -> None:
+    if lease is not None:
+        lease.release()
+
+
+@contextmanager
+def inflight_slot(api_key: str, endpoint_class: str, db_path: str = RATE_LIMIT_DB_PATH) -> Iterator[None]:
+    lease = acquire_slot(api_key, endpoint_class, db_path)
+    try:
+        yield
+    finally:
+        release_slot(lease)
+
+
+def _http_error(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=exc.status_code, detail=exc.detail, headers={"Retry-After": str(exc.retry_after)})
+
+
+async def check_rate_limit(api_key: str, endpoint_class: str) -> None:
+    try:
+        await run_in_threadpool(consume_token, api_key, endpoint_class)
+    except AdmissionRejected as exc:
+        raise _http_error(exc)
+
+
+@asynccontextmanager
+async def admit(api_key: str, endpoint_class: str) -> AsyncIterator[None]:
+    # Take the concurrency slot before spending a token, so a request turned
+    # away for concurrency does not also drain the client's rate budget.
+    try:
+        lease = await run_in_threadpool(acquire_slot, api_key, endpoint_class)
+    except AdmissionRejected as exc:
+        raise _http_error(exc)
+
+    try:
+        await check_rate_limit(api_key, endpoint_class)
+        yield
+    finally:
+        await run_in_threadpool(release_slot, lease)
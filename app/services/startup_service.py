@@ -0,0 +1,24 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def startup_lock(lock_path: str) -> Iterator[None]:
+    dir_name = os.path.dirname(lock_path)
+    if dir_name:
+        os.makedirs(dir_name, exist_ok=True)
+
+    with open(lock_path, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)